@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from config import ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов: меньшее значение обслуживается раньше
+PRIORITY_TEXT = 0
+PRIORITY_MEDIA = 1
+
+
+class AdmissionRejected(Exception):
+    """Очередь заполнена, запрос отклонён без обработки"""
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int, max_queue: int):
+        """
+        Ограничитель одновременных запросов с приоритетной очередью
+
+        Args:
+            max_in_flight (int): Сколько запросов выполняется одновременно
+            max_queue (int): Сколько запросов может ждать в очереди
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight должен быть не меньше 1")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters: list = []
+        self._counter = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        """Количество запросов, ожидающих в очереди"""
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: int,
+        on_queued: Optional[Callable[[int], Awaitable[None]]] = None,
+    ):
+        """
+        Занимает слот на время выполнения блока
+
+        Args:
+            priority (int): Приоритет запроса (PRIORITY_TEXT, PRIORITY_MEDIA)
+            on_queued: Корутина, которая получает позицию в очереди,
+                если запрос не может начаться сразу
+
+        Raises:
+            AdmissionRejected: Очередь заполнена
+        """
+        await self._acquire(priority, on_queued)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int, on_queued) -> None:
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue and not self._evict(priority):
+            logger.warning(f"Очередь заполнена ({self.max_queue}), запрос отклонён")
+            raise AdmissionRejected()
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._counter), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            if on_queued is not None:
+                try:
+                    await on_queued(self._position(entry))
+                except Exception as e:
+                    logger.error(f"Не удалось сообщить позицию в очереди: {e}")
+            await future
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # Слот уже был передан этому запросу — возвращаем его
+                self._release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _evict(self, priority: int) -> bool:
+        """
+        Вытесняет из очереди самый низкоприоритетный и самый новый запрос,
+        если он менее важен, чем новый; вытесненный получает AdmissionRejected
+
+        Returns:
+            bool: Удалось ли освободить место
+        """
+        if not self._waiters:
+            return False
+        victim = max(self._waiters, key=lambda waiter: waiter[:2])
+        if victim[0] <= priority:
+            return False
+        self._waiters.remove(victim)
+        heapq.heapify(self._waiters)
+        victim[2].set_exception(AdmissionRejected())
+        logger.warning("Очередь заполнена, вытеснен запрос с более низким приоритетом")
+        return True
+
+    def _position(self, entry) -> int:
+        return sum(1 for waiter in self._waiters if waiter[:2] < entry[:2]) + 1
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.max_in_flight:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+admission = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE)
+
+
+async def run_admitted(
+    priority: int,
+    handler: Callable[[], Awaitable[None]],
+    on_queued: Callable[[int], Awaitable[None]],
+    on_rejected: Callable[[], Awaitable[None]],
+) -> None:
+    """
+    Выполняет обработчик в слоте общей очереди запросов к Gemini
+
+    Args:
+        priority (int): Приоритет запроса (PRIORITY_TEXT, PRIORITY_MEDIA)
+        handler: Корутина-функция без аргументов, выполняющая запрос
+        on_queued: Сообщает пользователю позицию в очереди
+        on_rejected: Сообщает пользователю, что бот перегружен
+    """
+    try:
+        async with admission.slot(priority, on_queued):
+            await handler()
+    except AdmissionRejected:
+        await on_rejected()
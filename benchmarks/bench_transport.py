@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк накладных расходов на соединения при конкурентной нагрузке
+
+Все режимы выполняют настоящие вызовы клиентов против локального
+HTTPS-сервера (самоподписанный сертификат, openssl), который считает
+открытые соединения. Время замеряется для каждого запроса отдельно
+(p50/p95/среднее), а не делением общего времени на число запросов.
+
+Gemini (client.aio.models.get):
+- до: genai.Client с настройками по умолчанию, как раньше в gemini.py,
+  gemini_client.py и simple_bot.py (при установленном aiohttp genai
+  открывает новую сессию, а значит и TLS-соединение, на каждый запрос);
+- после: клиент с настройками transport.gemini_http_options().
+
+Telegram (HTTPXRequest.post):
+- до: HTTPXRequest с пулом по умолчанию Application.builder() (256);
+- после: transport.telegram_request().
+
+Сервер отвечает только по HTTP/1.1, поэтому HTTP/2 здесь не измеряется.
+Опционально сервер добавляет задержку при установке каждого соединения,
+имитируя сетевую задержку до удалённого API. Запуск:
+
+    python benchmarks/bench_transport.py --requests 500 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# config.py требует ключи при загрузке; для локального сервера подойдут любые
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+BODY = b'{"ok": true, "result": true, "name": "models/gemini-2.5-flash"}'
+RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+    b"Content-Length: " + str(len(BODY)).encode() + b"\r\n\r\n" + BODY
+)
+
+
+def make_certificate(directory: str) -> tuple[str, str]:
+    """Создаёт самоподписанный сертификат для 127.0.0.1"""
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-keyout", key, "-out", cert, "-subj", "/CN=localhost",
+         "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost"],
+        check=True, capture_output=True,
+    )
+    return cert, key
+
+
+class Server:
+    def __init__(self, handshake_delay: float):
+        """Локальный keep-alive сервер, считающий открытые соединения"""
+        self.handshake_delay = handshake_delay
+        self.connections = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        await asyncio.sleep(self.handshake_delay)
+        try:
+            while True:
+                headers = await reader.readuntil(b"\r\n\r\n")
+                for line in headers.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        await reader.readexactly(int(value))
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError, asyncio.CancelledError):
+            # CancelledError: сервер закрывается, а клиент держит keep-alive соединение
+            pass
+        finally:
+            writer.close()
+
+
+async def measure(call, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--handshake-delay", type=float, default=0.0,
+                        help="Задержка установки соединения в секундах")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_certificate(directory)
+        # genai и httpx доверяют сертификатам из SSL_CERT_FILE
+        os.environ["SSL_CERT_FILE"] = cert
+
+        from google import genai  # type: ignore
+        from google.genai import types
+        from telegram.request import HTTPXRequest
+        from transport import HTTP2_ENABLED, gemini_http_options, telegram_request
+
+        server_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        server_context.load_cert_chain(cert, key)
+        server = Server(args.handshake_delay)
+        tcp_server = await asyncio.start_server(server.handle, "127.0.0.1", 0, ssl=server_context)
+        port = tcp_server.sockets[0].getsockname()[1]
+        base_url = f"https://127.0.0.1:{port}/"
+
+        shared_options = gemini_http_options()
+        shared_options.base_url = base_url
+        gemini_before = genai.Client(api_key="benchmark", http_options=types.HttpOptions(base_url=base_url))
+        gemini_after = genai.Client(api_key="benchmark", http_options=shared_options)
+        telegram_before = HTTPXRequest(connection_pool_size=256)
+        telegram_after = telegram_request()
+        await telegram_before.initialize()
+        await telegram_after.initialize()
+
+        modes = [
+            ("Gemini до", lambda: gemini_before.aio.models.get(model="gemini-2.5-flash")),
+            ("Gemini после", lambda: gemini_after.aio.models.get(model="gemini-2.5-flash")),
+            ("Telegram до", lambda: telegram_before.post(f"{base_url}getMe")),
+            ("Telegram после", lambda: telegram_after.post(f"{base_url}getMe")),
+        ]
+        print(f"{args.requests} запросов, параллельно {args.concurrency}, TLS, "
+              f"задержка соединения {args.handshake_delay * 1000:.0f} мс, "
+              f"HTTP/2 в transport: {HTTP2_ENABLED} (сервер: только HTTP/1.1)")
+        print(f"{'':16} {'p50, мс':>8} {'p95, мс':>8} {'ср., мс':>8} {'всего, с':>9} {'соединений':>11}")
+        async with tcp_server:
+            for name, call in modes:
+                server.connections = 0
+                started = time.perf_counter()
+                latencies = await measure(call, args.requests, args.concurrency)
+                elapsed = time.perf_counter() - started
+                p95 = statistics.quantiles(latencies, n=20)[-1]
+                print(f"{name:16} {statistics.median(latencies) * 1000:8.2f} {p95 * 1000:8.2f} "
+                      f"{statistics.fmean(latencies) * 1000:8.2f} {elapsed:9.2f} {server.connections:11}")
+            await telegram_before.shutdown()
+            await telegram_after.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+import functools
 import logging
 from telegram import Update
 from telegram.ext import (
@@ -9,6 +10,8 @@ from telegram.ext import (
 )
 from gemini_client import GeminiClient
 from config import TELEGRAM_BOT_TOKEN
+from admission import run_admitted, PRIORITY_TEXT
+from transport import telegram_request, warm_up
 
 # Настройка логирования
 logging.basicConfig(
@@ -17,15 +20,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def admitted(priority: int):
+    """Пропускает обработчик через общую очередь запросов к Gemini"""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(self, update: Update, context: ContextTypes.DEFAULT_TYPE, *args):
+            await run_admitted(
+                priority,
+                lambda: handler(self, update, context, *args),
+                lambda position: update.message.reply_text(f"⏳ Вы #{position} в очереди, подождите немного..."),
+                lambda: update.message.reply_text("⏳ Бот сейчас перегружен. Пожалуйста, попробуйте через минуту."),
+            )
+        return wrapper
+    return decorator
+
 class TelegramBot:
     def __init__(self):
         """Инициализация Telegram бота"""
         self.gemini_client = GeminiClient()
         if not TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN не найден")
-        self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+        # Обновления обрабатываются параллельно, нагрузку ограничивает очередь admission
+        self.application = (
+            Application.builder()
+            .token(TELEGRAM_BOT_TOKEN)
+            .request(telegram_request())
+            .get_updates_request(telegram_request(1))
+            .concurrent_updates(True)
+            .post_init(self._post_init)
+            .build()
+        )
         self._setup_handlers()
 
+    async def _post_init(self, application: Application):
+        """Прогрев соединений с Gemini до приёма первых сообщений"""
+        await warm_up(self.gemini_client.client)
+
     def _setup_handlers(self):
         """Настройка обработчиков команд и сообщений"""
         # Обработчики команд
@@ -86,8 +116,11 @@ class TelegramBot:
             )
             return
 
-        text_to_analyze = " ".join(context.args)
-        
+        await self._analyze(update, context, " ".join(context.args))
+
+    @admitted(PRIORITY_TEXT)
+    async def _analyze(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text_to_analyze: str):
+        """Анализ текста через Gemini в слоте очереди"""
         # Отправляем сообщение о том, что анализируем
         analyzing_message = await update.message.reply_text("🔍 Анализирую текст...")
         
@@ -101,7 +134,7 @@ class TelegramBot:
 
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Обработка обычных текстовых сообщений"""
-        if not update.message or not update.message.text:
+        if not update.message or not update.message.text or not update.message.text.strip():
             return
             
         user_message = update.message.text
@@ -109,7 +142,12 @@ class TelegramBot:
         user_id = update.effective_user.id if update.effective_user else 0
         
         logger.info(f"Получено сообщение от {user_name} ({user_id}): {user_message[:50]}...")
-        
+        await self._respond(update, context, user_message, user_name, user_id)
+
+    @admitted(PRIORITY_TEXT)
+    async def _respond(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                       user_message: str, user_name: str, user_id: int):
+        """Ответ на сообщение через Gemini в слоте очереди"""
         # Отправляем индикатор печатания
         if update.effective_chat:
             await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
@@ -17,3 +17,30 @@ if not GEMINI_API_KEY:
 
 # Настройки для логирования
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Контроль нагрузки: сколько запросов к Gemini выполняется одновременно
+# и сколько может ждать своей очереди, прежде чем бот начнёт отвечать "занят"
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "4"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "20"))
+
+# Сколько секунд ждать остальные фото альбома (media group), прежде чем
+# отправить их в Gemini одним запросом
+MEDIA_GROUP_WINDOW = float(os.getenv("MEDIA_GROUP_WINDOW", "1.0"))
+
+# Кэш ответов /draw для первых сообщений диалога (по умолчанию выключен):
+# повторный промпт отвечается уже загруженными в Telegram картинками (file_id)
+DRAW_CACHE_ENABLED = os.getenv("DRAW_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+DRAW_CACHE_SIZE = int(os.getenv("DRAW_CACHE_SIZE", "256"))
+DRAW_CACHE_TTL = float(os.getenv("DRAW_CACHE_TTL", "86400"))
+
+# Общий HTTP-транспорт для Gemini и Telegram: размер пула соединений,
+# keep-alive, HTTP/2 (если установлен пакет h2) и прогревочные запросы при старте
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+HTTP_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_KEEPALIVE_CONNECTIONS", "16"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "true").lower() in ("1", "true", "yes")
+HTTP_WARMUP_REQUESTS = int(os.getenv("HTTP_WARMUP_REQUESTS", "2"))
+
+# Лимит соединений aiohttp в pyTelegramBotAPI; если не задан, остаётся
+# значение библиотеки (50)
+TELEBOT_REQUEST_LIMIT = os.getenv("TELEBOT_REQUEST_LIMIT")
@@ -0,0 +1,51 @@
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class DrawCache:
+    def __init__(self, max_size: int, ttl: float):
+        """
+        LRU-кэш результатов /draw с ограниченным временем жизни
+
+        Args:
+            max_size (int): Максимальное количество промптов в кэше
+            ttl (float): Время жизни записи в секундах
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        """Нормализует промпт: регистр и лишние пробелы не важны"""
+        return " ".join(prompt.lower().split())
+
+    def get(self, prompt: str) -> list[tuple[str, str]] | None:
+        """
+        Возвращает сохранённый ответ на промпт
+
+        Returns:
+            list: Части ответа ("text", текст) и ("photo", file_id) или None
+        """
+        key = self.key(prompt)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, parts = entry
+        if time.monotonic() - created > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        logger.info(f"Ответ /draw взят из кэша: {key[:50]}")
+        return parts
+
+    def put(self, prompt: str, parts: list[tuple[str, str]]) -> None:
+        """Сохраняет ответ на промпт, вытесняя самые старые записи"""
+        key = self.key(prompt)
+        self._entries[key] = (time.monotonic(), parts)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
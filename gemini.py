@@ -3,16 +3,18 @@ import time
 import traceback
 import os
 from PIL import Image
-from telebot.types import Message
+from telebot.types import Message, ReplyParameters
 from md2tgmd import escape
 from telebot import TeleBot
-from config import conf, generation_config
-from google import genai
+from config import conf, generation_config, DRAW_CACHE_ENABLED, DRAW_CACHE_SIZE, DRAW_CACHE_TTL
+from draw_cache import DrawCache
+from transport import get_gemini_client
 
 gemini_draw_dict = {}
 gemini_chat_dict = {}
 gemini_pro_chat_dict = {}
 default_model_dict = {}
+draw_cache = DrawCache(DRAW_CACHE_SIZE, DRAW_CACHE_TTL) if DRAW_CACHE_ENABLED else None
 
 model_1 = conf["model_1"]
 model_2 = conf["model_2"]
@@ -24,7 +26,7 @@ download_pic_notify = conf["download_pic_notify"]
 search_tool = {'google_search': {}}
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEYS")
-client = genai.Client(api_key=GEMINI_API_KEY)
+client = get_gemini_client(GEMINI_API_KEY)
 
 async def gemini_stream(bot:TeleBot, message:Message, m:str, model_type:str):
     sent_message = None
@@ -99,25 +101,64 @@ async def gemini_stream(bot:TeleBot, message:Message, m:str, model_type:str):
         else:
             await bot.reply_to(message, f"{error_info}\nError details: {str(e)}")
 
-async def gemini_edit(bot: TeleBot, message: Message, m: str, photo_file: bytes):
-    image = Image.open(io.BytesIO(photo_file))
+async def gemini_edit(bot: TeleBot, message: Message, m: str, photo_files: list[bytes]):
+    images = [Image.open(io.BytesIO(photo_file)) for photo_file in photo_files]
     try:
         response = await client.aio.models.generate_content(
             model=model_3,
-            contents=[m, image],
+            contents=[m, *images],
             config=generation_config
         )
     except Exception as e:
         await bot.send_message(message.chat.id, e.str())
     for part in response.candidates[0].content.parts:
         if part.text is not None:
-            await bot.send_message(message.chat.id, escape(part.text), parse_mode="MarkdownV2")
+            await bot.reply_to(message, escape(part.text), parse_mode="MarkdownV2")
         elif part.inline_data is not None:
             photo = part.inline_data.data
-            await bot.send_photo(message.chat.id, photo)
+            await bot.send_photo(message.chat.id, photo, reply_parameters=ReplyParameters(message.message_id))
+
+async def send_draw_text(bot: TeleBot, chat_id: int, text: str):
+    while len(text) > 4000:
+        await bot.send_message(chat_id, escape(text[:4000]), parse_mode="MarkdownV2")
+        text = text[4000:]
+    if text:
+        await bot.send_message(chat_id, escape(text), parse_mode="MarkdownV2")
+
+def draw_cache_usable(message:Message) -> bool:
+    # Only the first turn of a conversation is stateless and can be cached
+    return draw_cache is not None and str(message.from_user.id) not in gemini_draw_dict
+
+async def gemini_draw_cached(bot:TeleBot, message:Message, m:str) -> bool:
+    if not draw_cache_usable(message):
+        return False
+    cached_parts = draw_cache.get(m)
+    if cached_parts is None:
+        return False
+    for kind, value in cached_parts:
+        if kind == "text":
+            await send_draw_text(bot, message.chat.id, value)
+        else:
+            await bot.send_photo(message.chat.id, value)
+    # Start the user's own conversation so follow-ups are not answered from the shared cache
+    cached_text = "\n".join(value for kind, value in cached_parts if kind == "text")
+    history = []
+    if cached_text:
+        history = [
+            {"role": "user", "parts": [{"text": m}]},
+            {"role": "model", "parts": [{"text": cached_text}]},
+        ]
+    gemini_draw_dict[str(message.from_user.id)] = client.aio.chats.create(
+        model=model_3,
+        config=generation_config,
+        history=history,
+    )
+    return True
 
 async def gemini_draw(bot:TeleBot, message:Message, m:str):
     chat_dict = gemini_draw_dict
+    # `/draw --fresh` skips only the lookup, its first-turn result replaces the cached one
+    use_cache = draw_cache_usable(message)
     if str(message.from_user.id) not in chat_dict:
         chat = client.aio.chats.create(
             model=model_3,
@@ -127,14 +168,14 @@ async def gemini_draw(bot:TeleBot, message:Message, m:str):
     else:
         chat = chat_dict[str(message.from_user.id)]
     response = await chat.send_message(m)
+    sent_parts = []
     for part in response.candidates[0].content.parts:
         if part.text is not None:
-            text = part.text
-            while len(text) > 4000:
-                await bot.send_message(message.chat.id, escape(text[:4000]), parse_mode="MarkdownV2")
-                text = text[4000:]
-            if text:
-                await bot.send_message(message.chat.id, escape(text), parse_mode="MarkdownV2")
+            await send_draw_text(bot, message.chat.id, part.text)
+            sent_parts.append(("text", part.text))
         elif part.inline_data is not None:
             photo = part.inline_data.data
-            await bot.send_photo(message.chat.id, photo)
\ No newline at end of file
+            sent_photo = await bot.send_photo(message.chat.id, photo)
+            sent_parts.append(("photo", sent_photo.photo[-1].file_id))
+    if use_cache and any(kind == "photo" for kind, _ in sent_parts):
+        draw_cache.put(m, sent_parts)
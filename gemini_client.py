@@ -3,6 +3,7 @@ import os
 from google import genai  # type: ignore
 from google.genai import types
 from config import GEMINI_API_KEY
+from transport import get_gemini_client
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +11,7 @@ class GeminiClient:
     def __init__(self):
         """Инициализация клиента Gemini AI"""
         try:
-            self.client = genai.Client(api_key=GEMINI_API_KEY)
+            self.client = get_gemini_client(GEMINI_API_KEY)
             logger.info("Gemini клиент успешно инициализирован")
         except Exception as e:
             logger.error(f"Ошибка инициализации Gemini клиента: {e}")
@@ -39,7 +40,7 @@ class GeminiClient:
             
             logger.info(f"Отправляем запрос в Gemini для пользователя {user_name or 'Неизвестный'}")
             
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model="gemini-2.5-flash",
                 contents=prompt
             )
@@ -68,7 +69,7 @@ class GeminiClient:
         try:
             prompt = f"Проанализируй следующий текст и предоставь краткое резюме на русском языке:\n\n{text}"
             
-            response = self.client.models.generate_content(
+            response = await self.client.aio.models.generate_content(
                 model="gemini-2.5-flash",
                 contents=prompt
             )
@@ -1,8 +1,11 @@
+import asyncio
+import functools
 from telebot import TeleBot
 from telebot.types import Message
 from md2tgmd import escape
 import traceback
-from config import conf
+from config import conf, MEDIA_GROUP_WINDOW
+from admission import run_admitted, PRIORITY_TEXT, PRIORITY_MEDIA
 import gemini
 
 error_info = conf["error_info"]
@@ -15,6 +18,25 @@ gemini_chat_dict = gemini.gemini_chat_dict
 gemini_pro_chat_dict = gemini.gemini_pro_chat_dict
 default_model_dict = gemini.default_model_dict
 gemini_draw_dict = gemini.gemini_draw_dict
+media_group_dict = {}
+flushed_media_group_dict = {}
+flushed_media_group_ttl = 60
+
+busy_info = "The bot is busy right now, please try again in a minute."
+queue_info = "You are #{} in queue, please wait..."
+
+def admitted(priority: int):
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(message: Message, bot: TeleBot, *args) -> None:
+            await run_admitted(
+                priority,
+                lambda: handler(message, bot, *args),
+                lambda position: bot.reply_to(message, queue_info.format(position)),
+                lambda: bot.reply_to(message, busy_info),
+            )
+        return wrapper
+    return decorator
 
 async def start(message: Message, bot: TeleBot) -> None:
     try:
@@ -28,7 +50,7 @@ async def gemini_stream_handler(message: Message, bot: TeleBot) -> None:
     except IndexError:
         await bot.reply_to(message, escape("Please add what you want to say after /gemini. \nFor example: `/gemini Who is john lennon?`"), parse_mode="MarkdownV2")
         return
-    await gemini.gemini_stream(bot, message, m, model_1)
+    await _gemini_stream(message, bot, m, model_1)
 
 async def gemini_pro_stream_handler(message: Message, bot: TeleBot) -> None:
     try:
@@ -36,7 +58,11 @@ async def gemini_pro_stream_handler(message: Message, bot: TeleBot) -> None:
     except IndexError:
         await bot.reply_to(message, escape("Please add what you want to say after /gemini_pro. \nFor example: `/gemini_pro Who is john lennon?`"), parse_mode="MarkdownV2")
         return
-    await gemini.gemini_stream(bot, message, m, model_2)
+    await _gemini_stream(message, bot, m, model_2)
+
+@admitted(PRIORITY_TEXT)
+async def _gemini_stream(message: Message, bot: TeleBot, m: str, model_type: str) -> None:
+    await gemini.gemini_stream(bot, message, m, model_type)
 
 async def clear(message: Message, bot: TeleBot) -> None:
     if (str(message.from_user.id) in gemini_chat_dict):
@@ -62,6 +88,7 @@ async def switch(message: Message, bot: TeleBot) -> None:
         default_model_dict[str(message.from_user.id)] = True
         await bot.reply_to( message , "Now you are using "+model_1)
 
+@admitted(PRIORITY_TEXT)
 async def gemini_private_handler(message: Message, bot: TeleBot) -> None:
     m = message.text.strip()
     if str(message.from_user.id) not in default_model_dict:
@@ -73,53 +100,85 @@ async def gemini_private_handler(message: Message, bot: TeleBot) -> None:
         else:
             await gemini.gemini_stream(bot,message,m,model_2)
 
+async def collect_media_group(message: Message) -> list[Message] | None:
+    # The first photo of an album waits until no other photo has joined for
+    # MEDIA_GROUP_WINDOW seconds and gets the whole group, the other photos are
+    # only added to the group. Photos arriving after the group was handled are dropped
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    for flushed_id, flushed_at in list(flushed_media_group_dict.items()):
+        if now - flushed_at > flushed_media_group_ttl:
+            del flushed_media_group_dict[flushed_id]
+    group_id = message.media_group_id
+    if group_id in flushed_media_group_dict:
+        return None
+    if group_id in media_group_dict:
+        media_group_dict[group_id]["messages"].append(message)
+        media_group_dict[group_id]["last_photo"] = now
+        return None
+    group = media_group_dict[group_id] = {"messages": [message], "last_photo": now}
+    try:
+        while (delay := group["last_photo"] + MEDIA_GROUP_WINDOW - loop.time()) > 0:
+            await asyncio.sleep(delay)
+    finally:
+        del media_group_dict[group_id]
+        flushed_media_group_dict[group_id] = loop.time()
+    return group["messages"]
+
+async def download_photo(bot: TeleBot, message: Message) -> bytes:
+    file_path = await bot.get_file(message.photo[-1].file_id)
+    return await bot.download_file(file_path.file_path)
+
 async def gemini_photo_handler(message: Message, bot: TeleBot) -> None:
+    album = [message]
+    if message.media_group_id:
+        album = await collect_media_group(message)
+        if album is None:
+            return
+        message = next((x for x in album if x.caption), album[0])
     if message.chat.type != "private":
         s = message.caption or ""
         if not s or not (s.startswith("/gemini")):
             return
-        try:
-            m = s.strip().split(maxsplit=1)[1].strip() if len(s.strip().split(maxsplit=1)) > 1 else ""
-            file_path = await bot.get_file(message.photo[-1].file_id)
-            photo_file = await bot.download_file(file_path.file_path)
-        except Exception:
-            traceback.print_exc()
-            await bot.reply_to(message, error_info)
-            return
-        await gemini.gemini_edit(bot, message, m, photo_file)
-    else:
-        s = message.caption or ""
-        try:
-            m = s.strip().split(maxsplit=1)[1].strip() if len(s.strip().split(maxsplit=1)) > 1 else ""
-            file_path = await bot.get_file(message.photo[-1].file_id)
-            photo_file = await bot.download_file(file_path.file_path)
-        except Exception:
-            traceback.print_exc()
-            await bot.reply_to(message, error_info)
-            return
-        await gemini.gemini_edit(bot, message, m, photo_file)
+    await _gemini_photo_edit(message, bot, album)
 
-async def gemini_edit_handler(message: Message, bot: TeleBot) -> None:
-    if not message.photo:
-        await bot.reply_to(message, "pls send a photo")
-        return
+@admitted(PRIORITY_MEDIA)
+async def _gemini_photo_edit(message: Message, bot: TeleBot, album: list[Message]) -> None:
     s = message.caption or ""
     try:
         m = s.strip().split(maxsplit=1)[1].strip() if len(s.strip().split(maxsplit=1)) > 1 else ""
-        file_path = await bot.get_file(message.photo[-1].file_id)
-        photo_file = await bot.download_file(file_path.file_path)
-    except Exception as e:
+        photo_files = await asyncio.gather(*(download_photo(bot, x) for x in album))
+    except Exception:
         traceback.print_exc()
-        await bot.reply_to(message, e.str())
+        await bot.reply_to(message, error_info)
+        return
+    await gemini.gemini_edit(bot, message, m, list(photo_files))
+
+async def gemini_edit_handler(message: Message, bot: TeleBot) -> None:
+    if not message.photo:
+        await bot.reply_to(message, "pls send a photo")
         return
-    await gemini.gemini_edit(bot, message, m, photo_file)
+    await _gemini_photo_edit(message, bot, [message])
 
 async def draw_handler(message: Message, bot: TeleBot) -> None:
     try:
         m = message.text.strip().split(maxsplit=1)[1].strip()
     except IndexError:
+        m = ""
+    # `/draw --fresh <prompt>` always generates a new picture
+    bypass_cache = m.split(maxsplit=1)[:1] == ["--fresh"]
+    if bypass_cache:
+        m = m[len("--fresh"):].strip()
+    if not m:
         await bot.reply_to(message, escape("Please add what you want to draw after /draw. \nFor example: `/draw draw me a cat.`"), parse_mode="MarkdownV2")
         return
+    # Cache hits are answered right away, only generation waits for a slot
+    if not bypass_cache and await gemini.gemini_draw_cached(bot, message, m):
+        return
+    await _gemini_draw(message, bot, m)
+
+@admitted(PRIORITY_MEDIA)
+async def _gemini_draw(message: Message, bot: TeleBot, m: str) -> None:
     drawing_msg = await bot.reply_to(message, "Drawing...")
     try:
         await gemini.gemini_draw(bot, message, m)
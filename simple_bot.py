@@ -10,7 +10,6 @@ import os
 from dotenv import load_dotenv
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-from google import genai  # type: ignore
 
 # Загружаем переменные из .env файла
 load_dotenv()
@@ -39,8 +38,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Импорт после проверки ключей: config.py требует их при загрузке
+from transport import get_gemini_client, telegram_request, warm_up
+
 # Инициализируем Gemini клиент
-gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+gemini_client = get_gemini_client(GEMINI_API_KEY)
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка команды /start"""
@@ -86,7 +88,7 @@ async def analyze_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         prompt = f"Проанализируй этот текст и дай краткое резюме на русском:\n\n{text_to_analyze}"
-        response = gemini_client.models.generate_content(
+        response = await gemini_client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt
         )
@@ -121,7 +123,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         
         # Получаем ответ от Gemini
-        response = gemini_client.models.generate_content(
+        response = await gemini_client.aio.models.generate_content(
             model="gemini-2.5-flash",
             contents=prompt
         )
@@ -137,12 +139,23 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "❌ Произошла ошибка. Попробуйте позже."
         )
 
+async def post_init(application: Application):
+    """Прогрев соединений с Gemini до приёма первых сообщений"""
+    await warm_up(gemini_client)
+
 def main():
     """Запуск бота"""
     print("🚀 Запуск Telegram бота...")
     
     # Создаем приложение
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .request(telegram_request())
+        .get_updates_request(telegram_request(1))
+        .post_init(post_init)
+        .build()
+    )
     
     # Добавляем обработчики
     application.add_handler(CommandHandler("start", start_command))
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# config.py требует ключи при загрузке; для тестов подойдут любые значения
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, PRIORITY_MEDIA, PRIORITY_TEXT
+
+
+async def _job(controller, name, priority, log, hold=0.01):
+    try:
+        async with controller.slot(priority):
+            log.append(name)
+            await asyncio.sleep(hold)
+    except AdmissionRejected:
+        log.append(f"rejected {name}")
+
+
+def test_text_waiters_go_before_media():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        log = []
+        await asyncio.gather(
+            _job(controller, "first", PRIORITY_TEXT, log, hold=0.05),
+            _job(controller, "draw", PRIORITY_MEDIA, log),
+            _job(controller, "edit", PRIORITY_MEDIA, log),
+            _job(controller, "text", PRIORITY_TEXT, log),
+        )
+        return log
+
+    assert asyncio.run(scenario()) == ["first", "text", "draw", "edit"]
+
+
+def test_full_queue_evicts_newest_lower_priority_waiter():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=2)
+        log = []
+        await asyncio.gather(
+            _job(controller, "first", PRIORITY_TEXT, log, hold=0.05),
+            _job(controller, "draw", PRIORITY_MEDIA, log),
+            _job(controller, "edit", PRIORITY_MEDIA, log),
+            _job(controller, "text", PRIORITY_TEXT, log),
+        )
+        return log
+
+    assert asyncio.run(scenario()) == ["first", "rejected edit", "text", "draw"]
+
+
+def test_full_queue_rejects_when_nothing_less_important_waits():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=1)
+        log = []
+        await asyncio.gather(
+            _job(controller, "first", PRIORITY_MEDIA, log, hold=0.05),
+            _job(controller, "text", PRIORITY_TEXT, log),
+            _job(controller, "draw", PRIORITY_MEDIA, log),
+            _job(controller, "other text", PRIORITY_TEXT, log),
+        )
+        return log, controller.in_flight, controller.queued
+
+    log, in_flight, queued = asyncio.run(scenario())
+    assert log == ["first", "rejected draw", "rejected other text", "text"]
+    assert (in_flight, queued) == (0, 0)
+
+
+def test_queued_request_gets_its_position():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        positions = []
+
+        async def notify(position):
+            positions.append(position)
+
+        async def waiter(priority):
+            async with controller.slot(priority, notify):
+                pass
+
+        async with controller.slot(PRIORITY_TEXT):
+            tasks = [asyncio.create_task(waiter(PRIORITY_MEDIA))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(waiter(PRIORITY_TEXT)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return positions
+
+    assert asyncio.run(scenario()) == [1, 1]
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        async with controller.slot(PRIORITY_TEXT):
+            task = asyncio.create_task(_job(controller, "waiter", PRIORITY_TEXT, []))
+            await asyncio.sleep(0)
+            assert controller.queued == 1
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert controller.queued == 0
+        return controller.in_flight
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_slot_released_when_granted_waiter_is_cancelled():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=10)
+        log = []
+        async with controller.slot(PRIORITY_TEXT):
+            task = asyncio.create_task(_job(controller, "waiter", PRIORITY_TEXT, log))
+            await asyncio.sleep(0)
+        # Слот уже передан ожидающему, но тот отменён до того, как начал работу
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await _job(controller, "next", PRIORITY_TEXT, log)
+        return log, controller.in_flight
+
+    assert asyncio.run(scenario()) == (["next"], 0)
@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import logging
+import httpx
+from google import genai  # type: ignore
+from google.genai import types
+from config import (
+    HTTP_POOL_SIZE,
+    HTTP_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_ENABLE_HTTP2,
+    HTTP_WARMUP_REQUESTS,
+    TELEBOT_REQUEST_LIMIT,
+)
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 в httpx работает только при установленном пакете h2
+HTTP2_ENABLED = HTTP_ENABLE_HTTP2 and importlib.util.find_spec("h2") is not None
+
+_gemini_clients: dict[str, genai.Client] = {}
+
+
+def pool_limits(max_connections: int = HTTP_POOL_SIZE) -> httpx.Limits:
+    """Лимиты пула соединений из настроек"""
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(HTTP_KEEPALIVE_CONNECTIONS, max_connections),
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def gemini_http_options() -> types.HttpOptions:
+    """HTTP-настройки клиента Gemini с пулом соединений из настроек"""
+    # Свой transport заставляет genai использовать httpx (а не aiohttp,
+    # который открывает новую сессию на каждый запрос) и задаёт лимиты пула,
+    # keep-alive и HTTP/2
+    return types.HttpOptions(
+        client_args={
+            "transport": httpx.HTTPTransport(limits=pool_limits(), http2=HTTP2_ENABLED),
+        },
+        async_client_args={
+            "transport": httpx.AsyncHTTPTransport(limits=pool_limits(), http2=HTTP2_ENABLED),
+        },
+    )
+
+
+def get_gemini_client(api_key: str | None) -> genai.Client:
+    """
+    Возвращает общий клиент Gemini для ключа API
+
+    Все модули получают один и тот же клиент, поэтому запросы к Gemini
+    используют один пул соединений.
+
+    Args:
+        api_key (str): Ключ Gemini API
+
+    Returns:
+        genai.Client: Клиент с общим пулом соединений
+    """
+    client = _gemini_clients.get(api_key or "")
+    if client is None:
+        client = genai.Client(api_key=api_key, http_options=gemini_http_options())
+        _gemini_clients[api_key or ""] = client
+        logger.info(f"Создан общий клиент Gemini (пул {HTTP_POOL_SIZE}, HTTP/2: {HTTP2_ENABLED})")
+    return client
+
+
+def telegram_request(connection_pool_size: int = HTTP_POOL_SIZE):
+    """
+    Создаёт HTTP-клиент python-telegram-bot с настройками общего транспорта
+
+    Args:
+        connection_pool_size (int): Размер пула (для getUpdates достаточно 1)
+
+    Returns:
+        HTTPXRequest: Объект для Application.builder().request(...)
+    """
+    # Импорт здесь: стек на pyTelegramBotAPI не зависит от python-telegram-bot
+    from telegram.request import HTTPXRequest
+
+    return HTTPXRequest(
+        connection_pool_size=connection_pool_size,
+        http_version="2" if HTTP2_ENABLED else "1.1",
+        # PTB с http_version="2" отключает HTTP/1.1; оставляем его, чтобы
+        # HTTP/2 выбирался через ALPN только там, где сервер его поддерживает
+        httpx_kwargs={"limits": pool_limits(connection_pool_size), "http1": True},
+    )
+
+
+def configure_telebot() -> None:
+    """
+    Применяет TELEBOT_REQUEST_LIMIT к aiohttp-сессии pyTelegramBotAPI
+
+    Вызывается из точки входа бота на pyTelegramBotAPI до создания
+    AsyncTeleBot. Без настройки лимит библиотеки не меняется.
+    """
+    if not TELEBOT_REQUEST_LIMIT:
+        return
+    from telebot import asyncio_helper
+
+    asyncio_helper.REQUEST_LIMIT = int(TELEBOT_REQUEST_LIMIT)
+
+
+async def warm_up(client: genai.Client, model: str = "gemini-2.5-flash") -> None:
+    """
+    Выполняет HTTP_WARMUP_REQUESTS параллельных лёгких запросов к Gemini,
+    чтобы первые запросы пользователей не тратили время на TCP/TLS-рукопожатие
+
+    С HTTP/2 все запросы идут по одному соединению, поэтому прогревается
+    одно соединение; с HTTP/1.1 — до HTTP_WARMUP_REQUESTS соединений.
+
+    Args:
+        client (genai.Client): Клиент, чей пул нужно прогреть
+        model (str): Модель для лёгкого запроса метаданных
+    """
+    results = await asyncio.gather(
+        *(client.aio.models.get(model=model) for _ in range(HTTP_WARMUP_REQUESTS)),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors:
+        logger.warning(f"Прогрев соединений Gemini не удался: {errors[0]}")
+    else:
+        logger.info(f"Выполнено прогревочных запросов к Gemini: {len(results)} (HTTP/2: {HTTP2_ENABLED})")